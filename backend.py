@@ -5,6 +5,9 @@ import tempfile
 import subprocess
 import shutil
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, List
 from werkzeug.utils import secure_filename
 
@@ -15,14 +18,39 @@ from twelvelabs import TwelveLabs
 from dotenv import load_dotenv
 from tavily import TavilyClient
 
+import gemini_file_cache
+
+try:
+    import orjson
+
+    def jdumps(obj: Any, indent: bool = False) -> str:
+        """Serialize to a JSON string with orjson (3-10x faster than stdlib)"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+    def jloads(data):
+        """Parse JSON with orjson"""
+        return orjson.loads(data)
+except ImportError:
+    def jdumps(obj: Any, indent: bool = False) -> str:
+        """Serialize to a JSON string (stdlib fallback when orjson is absent)"""
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+    def jloads(data):
+        """Parse JSON (stdlib fallback when orjson is absent)"""
+        return json.loads(data)
+
 load_dotenv()
 
 MAX_VIDEO_TEXT_CHARS = 3200
-ASSET_POLL_SEC = 1.5
-INDEX_POLL_SEC = 2.0
+POLL_INITIAL_SEC = 0.5
+POLL_FACTOR = 1.5
+POLL_CAP_SEC = 15.0
+POLL_MAX_WAIT_SEC = 1800
 WEB_MAX_RESULTS = 5
 WEB_SEARCH_DEPTH = "basic"
 WEB_CONTENT_TRIM_CHARS = 3500
+WEB_CACHE_MAX_ENTRIES = 2048
+WEB_CACHE_TTL_SEC = 3600
 GEMINI_TEXT_MODEL = "gemini-1.5-flash"
 GEMINI_VIDEO_MODEL = "gemini-2.5-flash"
 
@@ -52,6 +80,18 @@ if not TAVILY_API_KEY:
 # Gemini client
 gemini_client = genai.Client(api_key=GEMINI_API_KEY)
 
+
+def _delete_gemini_file(file_name: str):
+    """Free server-side quota for an uploaded file the cache no longer tracks"""
+    try:
+        gemini_client.files.delete(name=file_name)
+        log_info(f"Deleted Gemini file: {file_name}")
+    except Exception as e:
+        log_info(f"⚠️ Failed to delete Gemini file {file_name}: {e}")
+
+
+gemini_file_cache.set_delete_callback(_delete_gemini_file)
+
 # Model names
 GEMINI_TEXT_MODEL_NAME = GEMINI_TEXT_MODEL
 GEMINI_VIDEO_MODEL_NAME = GEMINI_VIDEO_MODEL
@@ -78,6 +118,28 @@ app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB
 # =========================
 # RETRY HELPER
 # =========================
+
+# Client errors that will fail identically on every attempt
+NON_RETRYABLE_STATUS = {400, 401, 403, 404, 422}
+
+
+def _http_status(e) -> Optional[int]:
+    """Best-effort HTTP status extraction from an SDK exception"""
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after_sec(e) -> Optional[float]:
+    """Honor a Retry-After header on rate-limit responses when present"""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
 def with_retries(fn, retries=4, base_sleep=1.5):
     last_err = None
     for attempt in range(1, retries + 1):
@@ -87,12 +149,44 @@ def with_retries(fn, retries=4, base_sleep=1.5):
             raise
         except Exception as e:
             last_err = e
+            status = _http_status(e)
+            if status in NON_RETRYABLE_STATUS:
+                log_info(f"⚠️ Not retrying {type(e).__name__} (HTTP {status}) — client error won't recover")
+                raise
             sleep = base_sleep * (2 ** (attempt - 1))
-            log_info(f"⚠️ Retry {attempt}/{retries} after {type(e).__name__}: sleeping {sleep:.1f}s")
+            if status == 429:
+                retry_after = _retry_after_sec(e)
+                if retry_after is not None:
+                    sleep = max(sleep, retry_after)
+            log_info(f"⚠️ Retry attempt={attempt}/{retries} err={type(e).__name__} "
+                     f"status={status} sleep={sleep:.1f}s")
             time.sleep(sleep)
     raise RuntimeError(f"Failed after retries: {last_err}")
 
 
+def poll_until(fn, is_done, is_failed, what="job",
+               initial=POLL_INITIAL_SEC, factor=POLL_FACTOR,
+               cap=POLL_CAP_SEC, max_wait=POLL_MAX_WAIT_SEC):
+    """Poll fn() with capped exponential backoff until done, failed, or timed out
+
+    Starts fast so short jobs return quickly, then backs off to `cap` seconds
+    between status calls so long jobs don't hammer the API.
+    """
+    sleep = initial
+    elapsed = 0.0
+    while True:
+        status = fn()
+        if is_done(status):
+            return status
+        if is_failed(status):
+            raise RuntimeError(f"{what} failed")
+        if elapsed >= max_wait:
+            raise TimeoutError(f"{what} did not finish within {max_wait}s")
+        time.sleep(sleep)
+        elapsed += sleep
+        sleep = min(sleep * factor, cap)
+
+
 # =========================
 # C2PA + METADATA ANALYSIS (from backendp2.py)
 # =========================
@@ -124,21 +218,29 @@ def check_c2pa(path: str):
         return (False, {"error": str(e)})
 
 
+# Resolve ffprobe once at import instead of re-walking PATH per request
+FFPROBE = shutil.which("ffprobe")
+
+# summarize_metadata only reads these format fields, so don't ask ffprobe for
+# the full stream dump (shrinks its JSON output ~5-20x)
+FFPROBE_ENTRIES = "format=format_name,duration:format_tags=creation_time,encoder,com.apple.quicktime.make"
+
+
 def check_metadata(path: str):
     """Get generic metadata using ffprobe"""
-    if not shutil.which("ffprobe"):
+    if not FFPROBE:
         log_info("⚠️ FFmpeg not available for metadata extraction")
         return {}
-    
+
     try:
         result = subprocess.run(
-            ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", "-show_streams", path],
+            [FFPROBE, "-v", "quiet", "-print_format", "json", "-show_entries", FFPROBE_ENTRIES, path],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             check=True,
             text=True,
         )
-        return json.loads(result.stdout)
+        return jloads(result.stdout)
     except subprocess.CalledProcessError as e:
         log_info(f"Error running ffprobe: {e.stderr}")
         return {}
@@ -166,32 +268,91 @@ def summarize_metadata(path: str) -> Dict[str, Any]:
     return summary
 
 
-def check_video_synthid(video_path: str, video_metadata: Dict, twelvelabs_analysis: str) -> Dict[str, Any]:
+def upload_video_to_gemini(video_path: str):
+    """Upload a video to Gemini and wait until it is ready for analysis
+
+    Identical content is only uploaded once: results are cached by sha256
+    of the file bytes (see gemini_file_cache) for the Gemini retention window.
+    """
+    video_hash = gemini_file_cache.hash_file(video_path)
+    cached_name = gemini_file_cache.get(video_hash)
+    if cached_name:
+        try:
+            f = gemini_client.files.get(name=cached_name)
+            state = getattr(f, "state", None) or getattr(f, "metadata", {}).get("state")
+            if state == "ACTIVE":
+                log_info(f"✓ Gemini upload cache hit ({video_hash[:12]}...)")
+                return f
+        except Exception as e:
+            log_info(f"Cached Gemini file no longer valid: {e}")
+        gemini_file_cache.remove(video_hash)
+
+    log_info("Uploading video to Gemini...")
+    video_file = gemini_client.files.upload(file=video_path)
+
+    # Wait for processing
+    log_info("Waiting for video processing...")
+
+    def _file_state():
+        f = gemini_client.files.get(name=video_file.name)
+        state = getattr(f, "state", None) or getattr(f, "metadata", {}).get("state")
+        log_info(f"File state: {state}")
+        return state
+
+    poll_until(_file_state,
+               is_done=lambda s: s == "ACTIVE",
+               is_failed=lambda s: s in ("FAILED", "DELETED"),
+               what="Gemini file processing")
+
+    gemini_file_cache.put(video_hash, video_file.name)
+    return video_file
+
+
+def get_video_context_cache(video_file) -> Optional[str]:
+    """Create or reuse a Gemini context cache holding the video tokens
+
+    Every prompt against the same video can then reference the cache instead
+    of re-sending the full video token stream. Returns None when context
+    caching is unavailable (e.g. the video is below the minimum token count).
+    """
+    ttl = f"{gemini_file_cache.CONTEXT_CACHE_TTL_SEC}s"
+    try:
+        cached_name = gemini_file_cache.get_context_cache(video_file.name)
+        if cached_name:
+            try:
+                gemini_client.caches.update(name=cached_name, config={"ttl": ttl})
+                gemini_file_cache.touch_context_cache(video_file.name)
+                return cached_name
+            except Exception:
+                gemini_file_cache.remove_context_cache(video_file.name)
+
+        cache = gemini_client.caches.create(
+            model=GEMINI_VIDEO_MODEL_NAME,
+            config={"contents": [video_file], "ttl": ttl},
+        )
+        gemini_file_cache.put_context_cache(video_file.name, cache.name)
+        log_info(f"✓ Created Gemini context cache: {cache.name}")
+        return cache.name
+    except Exception as e:
+        log_info(f"⚠️ Context cache unavailable, sending video inline: {e}")
+        return None
+
+
+def check_video_synthid(video_path: str, video_metadata: Dict, twelvelabs_analysis: str,
+                        video_file=None) -> Dict[str, Any]:
     """Use Gemini to detect AI generation and misinformation signals"""
     log_step("SynthID: Analyzing video for AI generation...")
-    
+
     try:
-        # Upload video to Gemini
-        log_info("Uploading video to Gemini...")
-        video_file = gemini_client.files.upload(file=video_path)
-        
-        # Wait for processing
-        log_info("Waiting for video processing...")
-        while True:
-            f = gemini_client.files.get(name=video_file.name)
-            state = getattr(f, "state", None) or getattr(f, "metadata", {}).get("state")
-            log_info(f"File state: {state}")
-            if state == "ACTIVE":
-                break
-            if state in ("FAILED", "DELETED"):
-                raise RuntimeError(f"File processing failed with state={state}")
-            time.sleep(2)
-        
+        # Upload video to Gemini (unless the caller already uploaded it in parallel)
+        if video_file is None:
+            video_file = upload_video_to_gemini(video_path)
+
         # Analyze with multimodal context
         prompt = f"""
 You are a misinformation detection expert.
 
-METADATA: {json.dumps(video_metadata, indent=2)}
+METADATA: {jdumps(video_metadata, indent=True)}
 Video Analysis Context: {twelvelabs_analysis[:2000]}
 
 TASK:
@@ -205,27 +366,29 @@ Return EXACTLY this JSON structure:
 {{ "is_ai": bool, "trust_score": 0-100, "confidence": 0-100, "note": "string" }}
 """
         
-        # Use multimodal model for video analysis
+        # Use multimodal model for video analysis; prefer the context cache so
+        # the video tokens are billed/transferred once across prompts
         log_info(f"Using Gemini model: {GEMINI_VIDEO_MODEL_NAME}")
-        response = gemini_client.models.generate_content(
-            model=GEMINI_VIDEO_MODEL_NAME,
-            contents=[video_file, prompt]
-        )
+        cached_content = get_video_context_cache(video_file)
+        if cached_content:
+            response = gemini_client.models.generate_content(
+                model=GEMINI_VIDEO_MODEL_NAME,
+                contents=prompt,
+                config={"cached_content": cached_content},
+            )
+        else:
+            response = gemini_client.models.generate_content(
+                model=GEMINI_VIDEO_MODEL_NAME,
+                contents=[video_file, prompt]
+            )
         
         text = (response.text or "").strip()
         log_info(f"Gemini response: {text[:200]}...")
-        
-        # Extract JSON
-        if "```" in text:
-            parts = text.split("```")
-            if len(parts) >= 2:
-                text = parts[1].replace("json", "", 1).strip()
-        
-        start, end = text.find("{"), text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            return json.loads(text[start:end + 1])
-        
-        return {"is_ai": False, "trust_score": 50, "confidence": 50, "note": "Unable to parse response"}
+
+        try:
+            return extract_json(text)
+        except ValueError:
+            return {"is_ai": False, "trust_score": 50, "confidence": 50, "note": "Unable to parse response"}
         
     except Exception as e:
         log_info(f"⚠️ SynthID analysis error: {e}")
@@ -237,54 +400,99 @@ Return EXACTLY this JSON structure:
 # =========================
 # TWELVELABS PIPELINE (from backendp1.py)
 # =========================
-def create_index() -> str:
-    log_step("TwelveLabs: Creating index...")
-    idx = client.indexes.create(
-        index_name=f"forensics-{int(time.time())}",
-        models=[{"model_name": "pegasus1.2", "model_options": ["visual", "audio"]}],
-    )
-    log_info(f"✓ Created index: {idx.id}")
-    return idx.id
+# One persistent index shared by every request; only the videos are new.
+# The name encodes the model config so changing models gets a fresh index.
+SHARED_INDEX_NAME = "forensics-shared-pegasus12-v1"
+_shared_index_id: Optional[str] = None
+_shared_index_lock = threading.Lock()
 
 
-def upload_and_index(index_id: str, video_path: str) -> str:
+def get_shared_index_id(force_refresh: bool = False) -> str:
+    """Look up (or create once) the persistent TwelveLabs index
+
+    force_refresh drops the cached id and re-resolves, e.g. after the index
+    was deleted out from under us.
+    """
+    global _shared_index_id
+    with _shared_index_lock:
+        if _shared_index_id is not None and not force_refresh:
+            return _shared_index_id
+
+        log_step("TwelveLabs: Resolving shared index...")
+        try:
+            for idx in client.indexes.list(index_name=SHARED_INDEX_NAME):
+                _shared_index_id = idx.id
+                log_info(f"✓ Reusing index: {idx.id}")
+                return _shared_index_id
+        except Exception as e:
+            log_info(f"⚠️ Index lookup failed, creating fresh: {e}")
+
+        idx = client.indexes.create(
+            index_name=SHARED_INDEX_NAME,
+            models=[{"model_name": "pegasus1.2", "model_options": ["visual", "audio"]}],
+        )
+        _shared_index_id = idx.id
+        log_info(f"✓ Created index: {idx.id}")
+        return _shared_index_id
+
+
+# Read size for streaming uploads; keeps peak memory flat regardless of
+# MAX_CONTENT_LENGTH (the SDK iterates the file object chunk by chunk over
+# httpx, so a 500MB upload never lands in Python bytes)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def upload_and_index(index_id: str, video_source) -> str:
+    """Upload and index a video; video_source is a path or a seekable binary stream
+
+    Always hands the SDK a file object, never the file bytes, so the upload
+    streams in constant memory.
+    """
     log_step("TwelveLabs: Uploading video...")
-    
+
     def _upload():
-        with open(video_path, "rb") as f:
-            return client.assets.create(method="direct", file=f)
-    
+        if isinstance(video_source, str):
+            with open(video_source, "rb", buffering=UPLOAD_CHUNK_SIZE) as f:
+                return client.assets.create(method="direct", file=f)
+        # Rewind so a retry re-sends the stream from the start
+        video_source.seek(0)
+        return client.assets.create(method="direct", file=video_source)
+
     asset = with_retries(_upload)
     asset_id = asset.id
     log_info(f"Uploaded asset: {asset_id}")
     
     log_step("Waiting for asset processing...")
-    while True:
+
+    def _asset_status():
         st = client.assets.retrieve(asset_id)
         log_info(f"Asset status: {st.status}")
-        
-        if st.status == "ready":
-            break
-        if st.status == "failed":
-            raise RuntimeError("Asset processing failed")
-        time.sleep(ASSET_POLL_SEC)
-    
+        return st.status
+
+    poll_until(_asset_status,
+               is_done=lambda s: s == "ready",
+               is_failed=lambda s: s == "failed",
+               what="Asset processing")
+
+
     log_step("TwelveLabs: Indexing asset...")
     indexed = client.indexes.indexed_assets.create(index_id=index_id, asset_id=asset_id)
     indexed_id = indexed.id
     log_info(f"Indexing started: {indexed_id}")
     
     log_step("Waiting for indexing...")
-    while True:
+
+    def _index_status():
         st = client.indexes.indexed_assets.retrieve(index_id=index_id, indexed_asset_id=indexed_id)
         log_info(f"Index status: {st.status}")
-        
-        if st.status == "ready":
-            break
-        if st.status == "failed":
-            raise RuntimeError("Indexing failed")
-        time.sleep(INDEX_POLL_SEC)
-    
+        return st.status
+
+    poll_until(_index_status,
+               is_done=lambda s: s == "ready",
+               is_failed=lambda s: s == "failed",
+               what="Indexing")
+
+
     log_info(f"✓ Video ready. video_id={indexed_id}")
     return indexed_id
 
@@ -300,24 +508,52 @@ def analyze_video(video_id: str, prompt: str) -> str:
 # =========================
 # GEMINI HELPERS
 # =========================
+_JSON_DECODER = json.JSONDecoder()
+
+# Fast path for the common ```json ... ``` shape of model output, compiled
+# once instead of the old per-call split("```") passes
+_FENCE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+
+
+def extract_json(text: str) -> Dict[str, Any]:
+    """Extract the first JSON object embedded in model output
+
+    Tries the precompiled fence regex first, then falls back to a raw_decode
+    scan from each '{' candidate so fenced/chatty responses parse in one
+    forward pass. Raises ValueError when no object is found.
+    """
+    m = _FENCE.search(text)
+    if m:
+        try:
+            obj = _JSON_DECODER.decode(m.group(1))
+            if isinstance(obj, dict):
+                return obj
+        except ValueError:
+            pass
+
+    i = text.find("{")
+    while i != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, i)
+            if isinstance(obj, dict):
+                return obj
+        except ValueError:
+            pass
+        i = text.find("{", i + 1)
+    raise ValueError("No JSON object found in text")
+
+
 def gemini_json(prompt: str) -> Dict[str, Any]:
     resp = gemini_client.models.generate_content(
         model=GEMINI_TEXT_MODEL_NAME,
         contents=prompt
     )
     text = (resp.text or "").strip()
-    
-    if "```" in text:
-        parts = text.split("```")
-        if len(parts) >= 2:
-            text = parts[1].replace("json", "", 1).strip()
-    
-    start, end = text.find("{"), text.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        raw_json = text[start:end + 1]
-        return json.loads(raw_json)
-    
-    raise ValueError(f"Gemini did not return valid JSON.\nRaw:\n{text[:1200]}")
+
+    try:
+        return extract_json(text)
+    except ValueError:
+        raise ValueError(f"Gemini did not return valid JSON.\nRaw:\n{text[:1200]}")
 
 
 def gemini_structure(video_text: str, caption: str) -> Dict[str, Any]:
@@ -359,8 +595,28 @@ VIDEO_TEXT:
 # =========================
 # WEB FACT-CHECKING (TAVILY)
 # =========================
+
+# Normalized claim text -> (search result, expires_at epoch seconds), LRU order.
+# Duplicate claims within one video and canonical facts across requests repeat
+# often; a cache hit skips an entire Tavily round trip.
+_web_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_web_cache_lock = threading.Lock()
+
+
 def web_evidence_for_claim(claim: str) -> Dict[str, Any]:
-    """Fetch web sources for a claim"""
+    """Fetch web sources for a claim (cached by normalized claim text)"""
+    cache_key = claim.strip().lower()
+    now = time.time()
+    with _web_cache_lock:
+        entry = _web_cache.get(cache_key)
+        if entry is not None:
+            cached, expires_at = entry
+            if now < expires_at:
+                _web_cache.move_to_end(cache_key)
+                log_info(f"Web search cache hit: {claim[:60]}...")
+                return cached
+            del _web_cache[cache_key]
+
     def _search():
         return tavily_client.search(
             query=claim,
@@ -375,15 +631,21 @@ def web_evidence_for_claim(claim: str) -> Dict[str, Any]:
     res = with_retries(_search, retries=3, base_sleep=1.0)
     
     results = res.get("results", []) if isinstance(res, dict) else []
-    trimmed_results = []
+    # The Tavily response is ephemeral, so trim oversized content in place
+    # instead of copying every result dict first
     for r in results:
-        r2 = dict(r)
-        content = (r2.get("content") or "")
+        content = r.get("content") or ""
         if len(content) > WEB_CONTENT_TRIM_CHARS:
-            r2["content"] = content[:WEB_CONTENT_TRIM_CHARS] + "..."
-        trimmed_results.append(r2)
-    
-    return {"results": trimmed_results}
+            r["content"] = content[:WEB_CONTENT_TRIM_CHARS] + "..."
+
+    evidence = {"results": results}
+    with _web_cache_lock:
+        _web_cache[cache_key] = (evidence, now + WEB_CACHE_TTL_SEC)
+        _web_cache.move_to_end(cache_key)
+        while len(_web_cache) > WEB_CACHE_MAX_ENTRIES:
+            _web_cache.popitem(last=False)
+
+    return evidence
 
 
 def gemini_factcheck_one_claim(claim: str, claim_source: str, sources: Dict[str, Any]) -> Dict[str, Any]:
@@ -409,29 +671,80 @@ Rules:
 - No markdown.
 
 SOURCES:
-{json.dumps(sources, ensure_ascii=False)}
+{jdumps(sources)}
 """
     return gemini_json(prompt)
 
 
+def gemini_factcheck_batch(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fact-check all claims in a single Gemini call
+
+    items carry {claim, claim_source, sources}; the response must contain one
+    verdict per item in the same order. Raises on a malformed response so the
+    caller can fall back to per-claim calls.
+    """
+    prompt = f"""
+Return ONLY JSON.
+
+{{
+  "results": [
+    {{
+      "claim": "",
+      "claim_source": "",
+      "verdict": "true/false/mixed/unclear",
+      "confidence": 0-100,
+      "correct_information": "",
+      "explanation": "",
+      "citations": [{{"url":"", "supporting_text":""}}]
+    }}
+  ]
+}}
+
+Rules:
+- Fact-check EVERY item in ITEMS, one result per item, in the SAME order.
+- For each item use ONLY that item's "sources".
+- If sources do not support the claim, verdict MUST be "unclear".
+- If sources contradict each other, verdict="mixed".
+- Provide 1-3 citations per item. supporting_text must be short.
+- No markdown.
+
+ITEMS:
+{jdumps(items)}
+"""
+    parsed = gemini_json(prompt)
+    results = parsed.get("results")
+    if not isinstance(results, list) or len(results) != len(items):
+        raise ValueError(f"Batch fact-check returned {len(results) if isinstance(results, list) else 'no'} "
+                         f"results for {len(items)} items")
+    return results
+
+
 def gemini_factcheck(structured: Dict[str, Any]) -> Dict[str, Any]:
     """Fact-check all claims using web evidence"""
     log_step("Gemini+Web: Fact-checking claims...")
-    out: List[Dict[str, Any]] = []
-    
-    claims = structured.get("claims", []) or []
-    for i, c in enumerate(claims, start=1):
+
+    pairs = []
+    for c in structured.get("claims", []) or []:
         claim = (c.get("claim") or "").strip()
         claim_source = (c.get("claim_source") or "video").strip()
-        
-        if not claim:
-            continue
-        
-        log_info(f"Claim {i}/{len(claims)}: {claim[:70]}...")
-        sources = web_evidence_for_claim(claim)
-        
+        if claim:
+            pairs.append((claim, claim_source))
+
+    if not pairs:
+        return {"results": []}
+
+    # Web searches are network-bound, so fan them all out at once; the
+    # fact-check itself is then one batched Gemini call instead of N.
+    log_info(f"Searching web evidence for {len(pairs)} claims in parallel...")
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        sources_list = list(executor.map(lambda p: web_evidence_for_claim(p[0]), pairs))
+
+    out: List[Optional[Dict[str, Any]]] = [None] * len(pairs)
+    batch_items = []
+    batch_slots = []
+    for i, ((claim, claim_source), sources) in enumerate(zip(pairs, sources_list)):
         if not sources.get("results"):
-            out.append({
+            out[i] = {
                 "claim": claim,
                 "claim_source": claim_source,
                 "verdict": "unclear",
@@ -439,20 +752,32 @@ def gemini_factcheck(structured: Dict[str, Any]) -> Dict[str, Any]:
                 "correct_information": "",
                 "explanation": "No web sources found for this claim.",
                 "citations": [],
-            })
-            continue
-        
-        verdict = gemini_factcheck_one_claim(claim, claim_source, sources)
-        verdict.setdefault("claim", claim)
-        verdict.setdefault("claim_source", claim_source)
-        verdict.setdefault("verdict", "unclear")
-        verdict.setdefault("confidence", 0)
-        verdict.setdefault("correct_information", "")
-        verdict.setdefault("explanation", "")
-        verdict.setdefault("citations", [])
-        
-        out.append(verdict)
-    
+            }
+        else:
+            batch_items.append({"claim": claim, "claim_source": claim_source, "sources": sources})
+            batch_slots.append(i)
+
+    if batch_items:
+        try:
+            log_info(f"Fact-checking {len(batch_items)} claims in one Gemini call...")
+            verdicts = gemini_factcheck_batch(batch_items)
+        except Exception as e:
+            log_info(f"⚠️ Batch fact-check failed ({e}); falling back to per-claim calls")
+            with ThreadPoolExecutor(max_workers=12) as executor:
+                verdicts = list(executor.map(
+                    lambda item: gemini_factcheck_one_claim(item["claim"], item["claim_source"], item["sources"]),
+                    batch_items))
+
+        for slot, item, verdict in zip(batch_slots, batch_items, verdicts):
+            verdict.setdefault("claim", item["claim"])
+            verdict.setdefault("claim_source", item["claim_source"])
+            verdict.setdefault("verdict", "unclear")
+            verdict.setdefault("confidence", 0)
+            verdict.setdefault("correct_information", "")
+            verdict.setdefault("explanation", "")
+            verdict.setdefault("citations", [])
+            out[slot] = verdict
+
     return {"results": out}
 
 
@@ -504,7 +829,7 @@ Goal:
 - If no explicit year/date clues, use unclear.
 
 STRUCTURED:
-{json.dumps(structured, ensure_ascii=False)}
+{jdumps(structured)}
 """
     return gemini_json(prompt)
 
@@ -515,10 +840,17 @@ STRUCTURED:
 def compute_final(factcheck: Dict[str, Any], splice: Dict[str, Any], timing: Dict[str, Any]) -> Dict[str, Any]:
     """Compute final verdict and risk score"""
     results = factcheck.get("results", [])
-    
-    false_or_mixed = sum(1 for r in results if r.get("verdict") in ["false", "mixed"])
-    unclear = sum(1 for r in results if r.get("verdict") == "unclear")
-    avg_conf = (sum(r.get("confidence", 0) for r in results) / max(1, len(results)))
+
+    # Single pass over results instead of three separate scans
+    false_or_mixed = unclear = conf_sum = 0
+    for r in results:
+        v = r.get("verdict")
+        if v in ("false", "mixed"):
+            false_or_mixed += 1
+        elif v == "unclear":
+            unclear += 1
+        conf_sum += r.get("confidence", 0)
+    avg_conf = conf_sum / max(1, len(results))
     
     splice_score = int(splice.get("splice_risk_score", 0) or 0)
     time_score = int(timing.get("timeline_mismatch_risk_score", 0) or 0)
@@ -658,18 +990,21 @@ def analyze_factcheck():
     log_info(f"Video: {video_file.filename}")
     log_info(f"Caption length: {len(caption)}")
     log_info(f"Posted date: {posted_date or '(none)'}")
-    
-    # Save uploaded file
-    filename = secure_filename(video_file.filename)
-    temp_dir = tempfile.mkdtemp()
-    video_path = os.path.join(temp_dir, filename)
-    video_file.save(video_path)
-    
+
     try:
         # PHASE 1: TwelveLabs Analysis
+        # Werkzeug has already spooled the upload; hand its stream straight to
+        # TwelveLabs instead of copying it to disk and reading it back.
         log_step("PHASE 1: TwelveLabs Video Analysis")
-        idx_id = create_index()
-        video_id = upload_and_index(idx_id, video_path)
+        idx_id = get_shared_index_id()
+        try:
+            video_id = upload_and_index(idx_id, video_file.stream)
+        except Exception as e:
+            if "not found" not in str(e).lower():
+                raise
+            # The shared index was deleted out from under us; recreate once
+            idx_id = get_shared_index_id(force_refresh=True)
+            video_id = upload_and_index(idx_id, video_file.stream)
         
         log_step("Extracting transcript/visible text/scene summary...")
         base_prompt = """
@@ -740,13 +1075,6 @@ SCENE_SUMMARY:
         import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
-        
-    finally:
-        # Cleanup
-        try:
-            shutil.rmtree(temp_dir)
-        except:
-            pass
 
 
 @app.route('/api/analyze-ai', methods=['POST'])
@@ -764,25 +1092,53 @@ def analyze_ai():
     
     log_info(f"Video: {video_file.filename}")
     
-    filename = secure_filename(video_file.filename)
-    temp_dir = tempfile.mkdtemp()
-    video_path = os.path.join(temp_dir, filename)
-    video_file.save(video_path)
-    
+    # A single anonymous temp file instead of mkdtemp + save + rmtree:
+    # fewer syscalls and the file is guaranteed gone when it's closed
+    suffix = os.path.splitext(secure_filename(video_file.filename))[1]
+    temp_file = tempfile.NamedTemporaryFile(suffix=suffix)
+    video_file.save(temp_file)
+    temp_file.flush()
+    video_path = temp_file.name
+
     try:
         log_step("PHASE 1: Extracting Metadata")
         metadata = summarize_metadata(video_path)
         
-        log_step("PHASE 2: TwelveLabs Video Analysis")
-        idx_id = None
-        video_id = None
-        twelvelabs_analysis = ""
-        
-        try:
-            idx_id = create_index()
-            video_id = upload_and_index(idx_id, video_path)
-            
-            base_prompt = """
+        if metadata.get("c2pa_ai"):
+            # C2PA already proves the video is AI-generated; the multi-minute
+            # TwelveLabs indexing and Gemini SynthID passes can't change the
+            # verdict, so answer directly from the cheap signal.
+            log_step("C2PA metadata declares AI content — skipping TwelveLabs and SynthID")
+            twelvelabs_analysis = "Skipped: C2PA metadata already declares AI-generated content"
+            synthid = {
+                "is_ai": True,
+                "trust_score": 10,
+                "confidence": 95,
+                "note": "C2PA metadata declares AI-generated content; deep analysis skipped.",
+            }
+        else:
+            log_step("PHASE 2: TwelveLabs Video Analysis")
+            idx_id = None
+            video_id = None
+            twelvelabs_analysis = ""
+
+            # The Gemini upload (for SynthID) and the TwelveLabs upload+index are both
+            # multi-minute network waits with no dependency on each other, so overlap them.
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                gemini_future = executor.submit(upload_video_to_gemini, video_path)
+
+                try:
+                    idx_id = get_shared_index_id()
+                    try:
+                        video_id = upload_and_index(idx_id, video_path)
+                    except Exception as e:
+                        if "not found" not in str(e).lower():
+                            raise
+                        # The shared index was deleted out from under us; recreate once
+                        idx_id = get_shared_index_id(force_refresh=True)
+                        video_id = upload_and_index(idx_id, video_path)
+
+                    base_prompt = """
 Analyze this video and provide:
 TRANSCRIPT:
 VISIBLE_TEXT:
@@ -790,14 +1146,21 @@ SCENE_SUMMARY:
 AUDIO_CHARACTERISTICS:
 VISUAL_QUALITY:
 """
-            twelvelabs_analysis = analyze_video(video_id, base_prompt)
-            log_info(f"✓ TwelveLabs analysis complete ({len(twelvelabs_analysis)} chars)")
-        except Exception as tl_error:
-            log_info(f"⚠️ TwelveLabs analysis failed: {tl_error}")
-            twelvelabs_analysis = "TwelveLabs analysis unavailable"
-        
-        log_step("PHASE 3: SynthID AI Detection")
-        synthid = check_video_synthid(video_path, metadata, twelvelabs_analysis)
+                    twelvelabs_analysis = analyze_video(video_id, base_prompt)
+                    log_info(f"✓ TwelveLabs analysis complete ({len(twelvelabs_analysis)} chars)")
+                except Exception as tl_error:
+                    log_info(f"⚠️ TwelveLabs analysis failed: {tl_error}")
+                    twelvelabs_analysis = "TwelveLabs analysis unavailable"
+
+                try:
+                    gemini_video_file = gemini_future.result()
+                except Exception as upload_error:
+                    log_info(f"⚠️ Parallel Gemini upload failed: {upload_error}")
+                    gemini_video_file = None
+
+            log_step("PHASE 3: SynthID AI Detection")
+            synthid = check_video_synthid(video_path, metadata, twelvelabs_analysis,
+                                          video_file=gemini_video_file)
         
         report = {
             "is_ai_generated": synthid.get("is_ai", False) or metadata.get("c2pa_ai", False),
@@ -830,13 +1193,10 @@ VISUAL_QUALITY:
         import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
-        
+
     finally:
-        # Cleanup
-        try:
-            shutil.rmtree(temp_dir)
-        except:
-            pass
+        # Closing deletes the temp file, even on exception
+        temp_file.close()
 
 
 @app.route('/api/health', methods=['GET'])
@@ -893,5 +1253,6 @@ if __name__ == '__main__':
     print("  POST /api/analyze-ai         - AI generation detection")
     print("  GET  /api/health             - Health check")
     print("=" * 60)
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Dev server only — use gunicorn via wsgi.py in production (see README)
+    app.run(host='0.0.0.0', port=5000, debug=os.getenv("FLASK_DEBUG", "0") == "1")
 
@@ -0,0 +1,91 @@
+"""
+Filesystem Cache for TwelveLabs Detection Results
+Keyed by the video's content hash so repeat scans of the same file become a
+hash + JSON load instead of a remote inference
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+TWELVELABS_MODEL = "pegasus1.2"
+DETECTOR_VERSION = "1"
+
+# Baked into every entry; bumping the model or detector version invalidates
+# old cache files automatically
+SCHEMA_VERSION = hashlib.sha256(f"{TWELVELABS_MODEL}|{DETECTOR_VERSION}".encode()).hexdigest()[:16]
+
+
+try:
+    import blake3
+
+    def hash_video(video_path):
+        """
+        Hash the file with BLAKE3's multithreaded mmap fast path (5-10x the
+        throughput of sha256 on large files)
+        Returns: hex digest used as the cache key
+        """
+        hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        hasher.update_mmap(video_path)
+        return hasher.hexdigest()
+except ImportError:
+    def hash_video(video_path):
+        """
+        Stream the file through sha256 (via OpenSSL's accelerated file_digest
+        path on Python 3.11+)
+        Returns: hex digest used as the cache key
+        """
+        with open(video_path, "rb") as f:
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            h = hashlib.sha256()
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                h.update(chunk)
+            return h.hexdigest()
+
+
+class TwelveLabsCache:
+    """Content-addressed JSON cache for TwelveLabs API responses"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = Path(cache_dir or os.path.join(tempfile.gettempdir(), "twelvelabs_cache"))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, video_hash):
+        return self.cache_dir / f"{video_hash}.json"
+
+    def get(self, video_hash):
+        """
+        Look up a cached result by content hash
+        Returns: the cached result, or None on miss / schema mismatch
+        """
+        try:
+            with open(self._entry_path(video_hash), "r") as f:
+                envelope = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if envelope.get("schema_version") != SCHEMA_VERSION:
+            return None
+        return envelope.get("result")
+
+    def put(self, video_hash, result):
+        """
+        Store a successful result atomically (tmp file + os.replace)
+        Failed/negative results should not be cached - only call this on success
+        """
+        path = self._entry_path(video_hash)
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"schema_version": SCHEMA_VERSION, "result": result}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # stderr: put() runs inside detect_ai_video, whose callers promise
+            # JSONL-only stdout in --jsonl/--server modes
+            print(f"Warning: could not write cache entry: {e}", file=sys.stderr)
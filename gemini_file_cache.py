@@ -0,0 +1,157 @@
+"""
+Content-hash cache for Gemini file uploads
+Maps sha256(video bytes) -> uploaded Gemini file name so repeat submissions
+of identical content skip the upload + PROCESSING wait entirely.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+HASH_CHUNK_SIZE = 1024 * 1024
+CACHE_MAX_ENTRIES = 64
+CACHE_TTL_SEC = 47 * 3600  # just under Gemini's 48-hour file retention
+CACHE_PATH = os.path.join(tempfile.gettempdir(), "gemini_file_cache.json")
+
+CONTEXT_CACHE_TTL_SEC = 600
+
+_lock = threading.Lock()
+# sha256 hex -> (gemini file name, expires_at epoch seconds), LRU order
+_entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+# Called with a Gemini file name whenever the cache stops tracking it, so the
+# server-side file can be deleted instead of lingering against the 20GB quota
+_delete_callback = None
+
+
+def set_delete_callback(fn):
+    """Register a cleanup function invoked when an entry is evicted or expires"""
+    global _delete_callback
+    _delete_callback = fn
+
+
+def _delete_async(file_name: str):
+    cb = _delete_callback
+    if cb is not None:
+        # Background thread so callers never wait on the delete RPC
+        threading.Thread(target=cb, args=(file_name,), daemon=True).start()
+# gemini file name -> (context cache name, expires_at epoch seconds)
+_context_caches: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def hash_file(path: str) -> str:
+    """Stream the file through sha256 in 1MB chunks"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get(video_hash: str) -> Optional[str]:
+    """Return the cached Gemini file name for this content hash, or None"""
+    with _lock:
+        entry = _entries.get(video_hash)
+        if entry is None:
+            return None
+        file_name, expires_at = entry
+        if time.time() >= expires_at:
+            del _entries[video_hash]
+            _delete_async(file_name)
+            return None
+        _entries.move_to_end(video_hash)
+        return file_name
+
+
+def put(video_hash: str, file_name: str):
+    """Remember an uploaded file, evicting the oldest entries past the cap"""
+    with _lock:
+        _entries[video_hash] = (file_name, time.time() + CACHE_TTL_SEC)
+        _entries.move_to_end(video_hash)
+        while len(_entries) > CACHE_MAX_ENTRIES:
+            _, (evicted_name, _) = _entries.popitem(last=False)
+            _delete_async(evicted_name)
+
+
+def remove(video_hash: str):
+    """Drop a stale entry (e.g. the file expired server-side)"""
+    with _lock:
+        _entries.pop(video_hash, None)
+
+
+def get_context_cache(file_name: str) -> Optional[str]:
+    """Return the Gemini context cache name for an uploaded file, or None"""
+    with _lock:
+        entry = _context_caches.get(file_name)
+        if entry is None:
+            return None
+        cache_name, expires_at = entry
+        if time.time() >= expires_at:
+            del _context_caches[file_name]
+            return None
+        return cache_name
+
+
+def put_context_cache(file_name: str, cache_name: str):
+    """Remember a context cache created for an uploaded file"""
+    with _lock:
+        _context_caches[file_name] = (cache_name, time.time() + CONTEXT_CACHE_TTL_SEC)
+        while len(_context_caches) > CACHE_MAX_ENTRIES:
+            _context_caches.popitem(last=False)
+
+
+def touch_context_cache(file_name: str):
+    """Extend a context cache entry after a server-side TTL refresh"""
+    with _lock:
+        if file_name in _context_caches:
+            cache_name, _ = _context_caches[file_name]
+            _context_caches[file_name] = (cache_name, time.time() + CONTEXT_CACHE_TTL_SEC)
+
+
+def remove_context_cache(file_name: str):
+    """Drop a context cache entry that turned out to be stale"""
+    with _lock:
+        _context_caches.pop(file_name, None)
+
+
+def save():
+    """
+    Persist entries so the cache survives restarts
+    Plain JSON (like detector_cache): the payload is only strings and floats,
+    and unpickling an attacker-planted file from the shared temp dir would be
+    arbitrary code execution
+    """
+    try:
+        with _lock:
+            snapshot = dict(_entries)
+        tmp_path = CACHE_PATH + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, CACHE_PATH)
+    except Exception:
+        pass
+
+
+def _load():
+    try:
+        with open(CACHE_PATH, "r") as f:
+            snapshot = json.load(f)
+        now = time.time()
+        with _lock:
+            for video_hash, entry in snapshot.items():
+                file_name, expires_at = entry
+                if isinstance(file_name, str) and isinstance(expires_at, (int, float)) \
+                        and expires_at > now:
+                    _entries[video_hash] = (file_name, expires_at)
+    except Exception:
+        pass
+
+
+_load()
+atexit.register(save)
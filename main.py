@@ -1,29 +1,142 @@
 """
 Main entry point for AI Video Detector
 Run this file to check if a video is AI-generated
+Pass a directory or glob to batch-scan many videos concurrently
 """
 
+import argparse
+import glob
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
 from config import VIDEO_PATH
-from detector import detect_ai_video
+from detector import detect_ai_video, get_video_metadata_batch
+
+try:
+    import orjson
+
+    def _result_bytes(path, result):
+        return orjson.dumps({"path": path, **asdict(result)},
+                            option=orjson.OPT_APPEND_NEWLINE, default=str)
+except ImportError:
+    import json
+
+    def _result_bytes(path, result):
+        return (json.dumps({"path": path, **asdict(result)}, default=str) + "\n").encode()
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".webm", ".avi", ".wmv", ".flv", ".mkv")
+JSONL_BUFFER_SIZE = 1 << 20
+
+
+def collect_videos(target):
+    """
+    Expand a file, directory, or glob pattern into a list of video paths
+    """
+    if os.path.isdir(target):
+        return sorted(
+            os.path.join(target, name)
+            for name in os.listdir(target)
+            if name.lower().endswith(VIDEO_EXTENSIONS)
+        )
+    if any(ch in target for ch in "*?["):
+        return sorted(glob.glob(target))
+    return [target]
+
+
+def run_batch(paths):
+    """
+    Scan many videos concurrently
+    Threads (not processes) because the work is ffprobe subprocesses and
+    network waits, which overlap without fighting the GIL
+    """
+    # Prewarm the shared metadata cache in one pass (PyAV in-process when
+    # installed) so every detect_ai_video below gets a cache hit instead of
+    # spawning its own probe
+    get_video_metadata_batch(paths)
+    max_workers = min(len(paths), 4 * (os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(detect_ai_video, paths))
+
+
+def run_server():
+    """
+    Persistent-worker mode: read video paths from stdin, one JSONL result out
+    per video on stdout (diagnostics go to stderr, so stdout stays pipeable).
+    Imports, caches, and the TwelveLabs client are paid once for the whole
+    scan, e.g.: find . -name '*.mp4' | python main.py --server | jq .is_ai
+    """
+    for line in sys.stdin:
+        path = line.strip()
+        if not path:
+            continue
+        result = detect_ai_video(path)
+        sys.stdout.buffer.write(_result_bytes(path, result))
+        sys.stdout.buffer.flush()
 
 
 def main():
-    print("=" * 50)
-    print("AI VIDEO DETECTOR")
-    print("=" * 50)
-    print()
-    
+    parser = argparse.ArgumentParser(description="AI Video Detector")
+    parser.add_argument(
+        "target", nargs="?", default=VIDEO_PATH,
+        help="video file, directory, or glob pattern (default: VIDEO_PATH from .env)"
+    )
+    parser.add_argument(
+        "--jsonl", action="store_true",
+        help="emit one JSON object per video on stdout (machine-readable)"
+    )
+    parser.add_argument(
+        "--server", action="store_true",
+        help="read video paths from stdin in a loop, emitting JSONL results "
+             "on stdout (diagnostics on stderr)"
+    )
+    args = parser.parse_args()
+
+    if args.server:
+        run_server()
+        return
+
+    if not args.jsonl:
+        # Single buffered writes instead of one syscall+lock per print line
+        sys.stdout.write(
+            "=" * 50 + "\n"
+            "AI VIDEO DETECTOR\n"
+            + "=" * 50 + "\n\n"
+        )
+        sys.stdout.flush()
+
+    paths = collect_videos(args.target)
+    if not paths:
+        # stderr, so a --jsonl consumer sees an empty (not corrupted) stream
+        sys.stderr.write(f"No videos found for: {args.target}\n")
+        return
+
     # Run detection
-    result = detect_ai_video(VIDEO_PATH)
-    
+    if len(paths) == 1:
+        results = [detect_ai_video(paths[0])]
+    else:
+        results = run_batch(paths)
+
     # Display results
-    print()
-    print("-" * 50)
-    print("RESULTS:")
-    print("-" * 50)
-    print(f"Is AI Generated: {result['is_ai']}")
-    print(f"Reason: {result['reason']}")
-    print()
+    if args.jsonl:
+        # Newline-delimited JSON through a 1MB buffer: pipes cleanly into
+        # jq/duckdb and skips the human-readable formatting entirely
+        out = io.BufferedWriter(io.FileIO(sys.stdout.fileno(), "w", closefd=False),
+                                buffer_size=JSONL_BUFFER_SIZE)
+        for path, result in zip(paths, results):
+            out.write(_result_bytes(path, result))
+        out.flush()
+        return
+
+    lines = ["", "-" * 50, "RESULTS:", "-" * 50]
+    for path, result in zip(paths, results):
+        lines.append(path)
+        lines.append(f"  Is AI Generated: {result.is_ai}")
+        lines.append(f"  Reason: {result.reason}")
+    sys.stdout.write("\n".join(lines) + "\n\n")
+    sys.stdout.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+"""
+SQLite Cache for Video Metadata
+Stores parsed ffprobe/deffcode metadata keyed by (path, mtime, size) so
+re-scanning an unchanged file skips the ffprobe subprocess entirely
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+
+    def _loads(data):
+        return orjson.loads(data)
+except ImportError:
+    import json
+
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+    def _loads(data):
+        return json.loads(data)
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "video_metadata_cache.db")
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _get_conn():
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            "path TEXT, mtime_ns INTEGER, size INTEGER, json BLOB, "
+            "PRIMARY KEY (path, mtime_ns, size))"
+        )
+        _conn.commit()
+    return _conn
+
+
+def get(video_path):
+    """
+    Look up cached metadata for this exact file version
+    Returns: the metadata dict, or None on miss
+    """
+    try:
+        st = os.stat(video_path)
+    except OSError:
+        return None
+
+    key = (os.path.abspath(video_path), st.st_mtime_ns, st.st_size)
+    with _lock:
+        row = _get_conn().execute(
+            "SELECT json FROM meta WHERE path=? AND mtime_ns=? AND size=?", key
+        ).fetchone()
+
+    if row is None:
+        return None
+    try:
+        return _loads(row[0])
+    except ValueError:
+        return None
+
+
+def put(video_path, metadata):
+    """Store metadata for the file's current (mtime, size) version"""
+    try:
+        st = os.stat(video_path)
+        blob = _dumps(metadata)
+    except (OSError, TypeError, ValueError):
+        # Unreadable file or metadata that doesn't serialize - just skip caching
+        return
+
+    key = (os.path.abspath(video_path), st.st_mtime_ns, st.st_size)
+    with _lock:
+        conn = _get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (path, mtime_ns, size, json) VALUES (?, ?, ?, ?)",
+            key + (blob,),
+        )
+        conn.commit()
@@ -0,0 +1,13 @@
+"""
+WSGI entry point for production servers
+
+The analysis endpoints block for minutes on TwelveLabs/Gemini/Tavily, so run
+with threaded workers so concurrent requests (and /api/health) keep flowing:
+
+    gunicorn -k gthread -w 2 --threads 16 --timeout 900 -b 0.0.0.0:5000 wsgi:app
+"""
+
+from backend import app
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=5000)